@@ -1,64 +1,125 @@
 #!/usr/bin/env python3
 import curses
-import time
 import subprocess
-import shlex
 import argparse
+import atexit
+import csv
+import heapq
+import io
 import os
-from datetime import datetime
+import select
+import shutil
+import sys
+import threading
+import time
+from collections import deque
+from operator import itemgetter
+from typing import NamedTuple, Optional
+
+try:
+    import pynvml
+except ImportError:
+    pynvml = None
 
 # Utilities
 
-def run_cmd(cmd: str) -> str:
+def run_cmd(argv: list, stderr=subprocess.STDOUT) -> str:
     try:
-        out = subprocess.check_output(shlex.split(cmd), stderr=subprocess.STDOUT)
-        return out.decode('utf-8', errors='ignore')
-    except subprocess.CalledProcessError as e:
-        return e.output.decode('utf-8', errors='ignore')
+        out = subprocess.run(argv, stdout=subprocess.PIPE, stderr=stderr).stdout
     except FileNotFoundError:
         return ""
+    return out.decode('utf-8', errors='ignore')
+
+
+_nvidia_smi_path = None
 
 
 def have_nvidia_smi() -> bool:
-    return subprocess.call(['which', 'nvidia-smi'], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL) == 0
+    # Resolved once; the binary does not come and go while we run
+    global _nvidia_smi_path
+    if _nvidia_smi_path is None:
+        _nvidia_smi_path = shutil.which('nvidia-smi') or ''
+    return bool(_nvidia_smi_path)
 
 
 def parse_csv(lines):
-    rows = []
-    for ln in lines.strip().splitlines():
-        if not ln.strip():
-            continue
-        parts = [p.strip() for p in ln.split(',')]
-        rows.append(parts)
-    return rows
+    # nvidia-smi pads each field with one leading space; the C csv reader
+    # drops it (skipinitialspace) and yields [] for blank lines
+    return [r for r in csv.reader(io.StringIO(lines), skipinitialspace=True) if r]
+
+
+class GpuStat(NamedTuple):
+    index: int
+    name: str
+    temp: int
+    util: int
+    mem_used: int
+    mem_total: int
+    pwr: Optional[float]
+    pwr_lim: Optional[float]
+    sm_clock: Optional[int]
+    fan: Optional[int]
+    uuid: str
+
+
+GPU_FIELDS = [
+    'uuid', 'index', 'name', 'temperature.gpu', 'utilization.gpu',
+    'memory.used', 'memory.total', 'power.draw', 'power.limit',
+    'clocks.sm', 'fan.speed'
+]
+
+# nvidia-smi command lines are fixed, so they are built once at import
+_QUERY_GPU_ARGV = ['nvidia-smi', '--query-gpu=' + ','.join(GPU_FIELDS), '--format=csv,noheader,nounits']
+_QUERY_APPS_ARGV = ['nvidia-smi', '--query-compute-apps=pid,process_name,used_memory,gpu_uuid',
+                    '--format=csv,noheader,nounits']
+_PMON_ONCE_ARGV = ['nvidia-smi', 'pmon', '-c', '1', '-s', 'um']
 
 
 def get_gpu_stats():
     # Query per-GPU stats
-    fields = [
-        'uuid', 'index', 'name', 'temperature.gpu', 'utilization.gpu',
-        'memory.used', 'memory.total', 'power.draw', 'power.limit',
-        'clocks.sm', 'fan.speed'
-    ]
-    cmd = f"nvidia-smi --query-gpu={','.join(fields)} --format=csv,noheader,nounits"
-    out = run_cmd(cmd)
+    return parse_gpu_stats(run_cmd(_QUERY_GPU_ARGV))
+
+
+def _int_or_none(v):
+    return int(v) if v != 'N/A' else None
+
+
+def _float_or_none(v):
+    return float(v) if v != 'N/A' else None
+
+
+def _gpu_stat(r):
+    # Names and UUIDs repeat every tick; interning them makes the
+    # uuid_to_index lookups per process compare by identity
+    return GpuStat(
+        int(r[1]),
+        sys.intern(r[2]),
+        int(r[3]),
+        int(r[4]),
+        int(r[5]),
+        int(r[6]),
+        _float_or_none(r[7]),
+        _float_or_none(r[8]),
+        _int_or_none(r[9]),
+        _int_or_none(r[10]),
+        sys.intern(r[0]),
+    )
+
+
+def parse_gpu_stats(out):
     rows = parse_csv(out)
+    # Fast path: our own query fixes the field count, so well-formed output
+    # converts in one pass with no per-row exception handling
+    if all(len(r) == len(GPU_FIELDS) for r in rows):
+        try:
+            return [_gpu_stat(r) for r in rows]
+        except ValueError:
+            pass
     stats = []
     for r in rows:
         try:
-            stats.append({
-                'uuid': r[0],
-                'index': int(r[1]),
-                'name': r[2],
-                'temp': int(r[3]),
-                'util': int(r[4]),
-                'mem_used': int(r[5]),
-                'mem_total': int(r[6]),
-                'pwr': float(r[7]) if r[7] != 'N/A' else None,
-                'pwr_lim': float(r[8]) if r[8] != 'N/A' else None,
-                'sm_clock': int(r[9]) if r[9] != 'N/A' else None,
-                'fan': int(r[10]) if len(r) > 10 and r[10] != 'N/A' else None,
-            })
+            # Older drivers may omit the trailing fan column
+            stats.append(_gpu_stat(r if len(r) > 10 else r + ['N/A']))
         except Exception:
             # Be forgiving on parsing errors
             continue
@@ -67,9 +128,7 @@ def get_gpu_stats():
 
 def get_compute_processes():
     # Query compute processes (pid, name, used_memory, gpu_uuid)
-    fields = ['pid', 'process_name', 'used_memory', 'gpu_uuid']
-    cmd = f"nvidia-smi --query-compute-apps={','.join(fields)} --format=csv,noheader,nounits"
-    out = run_cmd(cmd)
+    out = run_cmd(_QUERY_APPS_ARGV)
     rows = parse_csv(out)
     procs = []
     for r in rows:
@@ -78,9 +137,10 @@ def get_compute_processes():
                 'pid': int(r[0]),
                 'name': os.path.basename(r[1]) if r[1] else '-',
                 'mem': int(r[2]) if r[2] != 'N/A' else 0,
-                'uuid': r[3],
-                # utilization placeholder updated from pmon later
-                'sm': None,
+                'uuid': sys.intern(r[3]),
+                # utilization placeholder updated from pmon later; SM util
+                # defaults to 0 so the per-GPU sort can use itemgetter
+                'sm': 0,
                 'mem_util': None,
             })
         except Exception:
@@ -90,10 +150,13 @@ def get_compute_processes():
 
 def get_pmon_once():
     # Use pmon to get per-process SM and MEM util. One-shot capture.
+    return parse_pmon(run_cmd(_PMON_ONCE_ARGV).splitlines())
+
+
+def parse_pmon(lines):
     # nvidia-smi pmon columns: # gpu pid type sm mem enc dec fb command
-    out = run_cmd('nvidia-smi pmon -c 1 -s um')
     pmon = []
-    for ln in out.splitlines():
+    for ln in lines:
         ln = ln.strip()
         if not ln or ln.startswith('#'):
             continue
@@ -104,7 +167,7 @@ def get_pmon_once():
         try:
             gpu_idx = int(parts[0])
             pid = int(parts[1]) if parts[1] != '-' else None
-            sm = None if parts[3] == '-' else int(parts[3])
+            sm = 0 if parts[3] == '-' else int(parts[3])
             mem = None if parts[4] == '-' else int(parts[4])
             cmd = parts[8] if len(parts) >= 9 else ''
             pmon.append({'gpu': gpu_idx, 'pid': pid, 'sm': sm, 'mem': mem, 'cmd': cmd})
@@ -113,7 +176,255 @@ def get_pmon_once():
     return pmon
 
 
+def _spawn(argv: list, **kwargs):
+    try:
+        return subprocess.Popen(argv, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, **kwargs)
+    except FileNotFoundError:
+        return None
+
+
+def _stop(proc):
+    if proc is not None and proc.poll() is None:
+        proc.terminate()
+        try:
+            proc.wait(timeout=1)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+
+
+class PmonReader(threading.Thread):
+    # Runs `nvidia-smi pmon -d` for the life of the monitor so NVML is
+    # initialised once, parsing each sample in the background. The newest
+    # parsed sample is kept in a one-slot deque that snapshot() peeks at.
+
+    def __init__(self, interval: float):
+        super().__init__(daemon=True)
+        # pmon only accepts whole seconds in [1, 10]
+        secs = min(max(int(round(interval)), 1), 10)
+        # -o T prefixes every line with the sample time, which delimits pmon blocks
+        self.proc = _spawn(['nvidia-smi', 'pmon', '-d', str(secs), '-s', 'um', '-o', 'T'], text=True, errors='ignore')
+        self.samples = deque(maxlen=1)
+
+    def run(self):
+        if self.proc is None:
+            return
+        stamp = None
+        block = []
+        for ln in iter(self.proc.stdout.readline, ''):
+            if not ln.strip() or ln.startswith('#'):
+                continue
+            parts = ln.split(None, 1)
+            if len(parts) < 2:
+                continue
+            # A sample is complete once a line with a later timestamp arrives
+            if block and parts[0] != stamp:
+                self.samples.append(parse_pmon(block))
+                block = []
+            stamp = parts[0]
+            block.append(parts[1])
+        # The stream ended; drop the last sample so callers stop using it
+        self.samples.clear()
+
+    def latest(self):
+        # None once pmon has exited, so snapshot() falls back to a one-shot run
+        if self.proc is None or self.proc.poll() is not None:
+            return None
+        try:
+            return self.samples[-1]
+        except IndexError:
+            return None
+
+    def close(self):
+        _stop(self.proc)
+
+
+class NvsmiStreamer:
+    # Keeps `nvidia-smi --query-gpu -lms` and a PmonReader running so each
+    # refresh reads samples that are already buffered instead of spawning
+    # fresh nvidia-smi processes.
+
+    def __init__(self, interval: float, gpu_count: int):
+        self.gpu_count = gpu_count
+        self.first_wait = max(interval, 1.0) * 3
+        # A block older than this is treated as no sample at all
+        self.stale_after = max(interval, 1.0) * 3
+        ms = max(int(interval * 1000), 100)
+        self.gpu_proc = _spawn(_QUERY_GPU_ARGV + ['-lms', str(ms)])
+        self.pmon = PmonReader(interval)
+        self.pmon.start()
+        self._partial = b''
+        self._gpu_lines = []
+        self._gpu_block = None
+        self._first_index = None
+        self._started = False
+        self._gpu_block_time = 0.0
+        atexit.register(self.close)
+
+    def _drain(self, proc, timeout: float):
+        # Read every complete line currently buffered on proc's stdout, waiting
+        # up to `timeout` seconds for the first one to arrive.
+        if proc is None:
+            return []
+        fd = proc.stdout.fileno()
+        buf = self._partial
+        lines = []
+        while True:
+            ready, _, _ = select.select([fd], [], [], timeout)
+            if not ready:
+                break
+            chunk = os.read(fd, 65536)
+            if not chunk:
+                break
+            buf += chunk
+            *done, buf = buf.split(b'\n')
+            lines.extend(ln.decode('utf-8', errors='ignore') for ln in done)
+            if lines:
+                timeout = 0
+        self._partial = buf
+        return lines
+
+    def read_gpu(self):
+        # Returns the newest complete N-line --query-gpu block (N = raw lines
+        # per sample). A line for the first GPU index always starts a new
+        # sample, so a short sample is dropped instead of misaligning the rest.
+        lines = self._gpu_lines
+        # The first call waits (up to first_wait) for a whole block to land;
+        # later calls only take what is already buffered, so a stream that
+        # never assembles a block cannot stall every tick
+        deadline = time.monotonic() + (0 if self._started else self.first_wait)
+        self._started = True
+        while True:
+            for ln in self._drain(self.gpu_proc, max(deadline - time.monotonic(), 0)):
+                if not ln.strip():
+                    continue
+                fields = ln.split(',', 2)
+                idx = fields[1].strip() if len(fields) > 2 else None
+                if self._first_index is None:
+                    self._first_index = idx
+                if lines and idx == self._first_index:
+                    lines.clear()
+                lines.append(ln)
+                if len(lines) == self.gpu_count:
+                    self._gpu_block = '\n'.join(lines)
+                    self._gpu_block_time = time.monotonic()
+                    lines.clear()
+            # Let snapshot() fall back to a one-shot query rather than serve a
+            # frozen block once the stream has exited or stalled
+            if self.gpu_proc is None or self.gpu_proc.poll() is not None:
+                return None
+            if self._gpu_block is not None or time.monotonic() >= deadline:
+                break
+        if time.monotonic() - self._gpu_block_time > self.stale_after:
+            return None
+        return self._gpu_block
+
+    def read_pmon(self):
+        # Newest complete pmon sample, or None until the first one is parsed
+        return self.pmon.latest()
+
+    def close(self):
+        _stop(self.gpu_proc)
+        self.pmon.close()
+
+
+# NVML (optional): (handle, index, uuid, name) per device, filled by nvml_init()
+_nvml_devices = []
+_nvml_last_ts = {}
+
+
+def _nvml_str(v):
+    # Older pynvml releases return bytes
+    return v.decode('utf-8', errors='ignore') if isinstance(v, bytes) else v
+
+
+def _nvml_try(fn, *args):
+    try:
+        return fn(*args)
+    except pynvml.NVMLError:
+        return None
+
+
+def nvml_init() -> bool:
+    if pynvml is None:
+        return False
+    try:
+        pynvml.nvmlInit()
+    except pynvml.NVMLError:
+        return False
+    atexit.register(pynvml.nvmlShutdown)
+    try:
+        for i in range(pynvml.nvmlDeviceGetCount()):
+            h = pynvml.nvmlDeviceGetHandleByIndex(i)
+            _nvml_devices.append((h, i, sys.intern(_nvml_str(pynvml.nvmlDeviceGetUUID(h))),
+                                  sys.intern(_nvml_str(pynvml.nvmlDeviceGetName(h)))))
+    except pynvml.NVMLError:
+        _nvml_devices.clear()
+        return False
+    return bool(_nvml_devices)
+
+
+def nvml_gpu_stats():
+    stats = []
+    for h, idx, uuid, name in _nvml_devices:
+        util = _nvml_try(pynvml.nvmlDeviceGetUtilizationRates, h)
+        mem = _nvml_try(pynvml.nvmlDeviceGetMemoryInfo, h)
+        pwr = _nvml_try(pynvml.nvmlDeviceGetPowerUsage, h)
+        pwr_lim = _nvml_try(pynvml.nvmlDeviceGetEnforcedPowerLimit, h)
+        stats.append(GpuStat(
+            idx,
+            name,
+            _nvml_try(pynvml.nvmlDeviceGetTemperature, h, pynvml.NVML_TEMPERATURE_GPU) or 0,
+            util.gpu if util else 0,
+            mem.used >> 20 if mem else 0,
+            mem.total >> 20 if mem else 0,
+            # NVML reports milliwatts
+            pwr / 1000.0 if pwr is not None else None,
+            pwr_lim / 1000.0 if pwr_lim is not None else None,
+            _nvml_try(pynvml.nvmlDeviceGetClockInfo, h, pynvml.NVML_CLOCK_SM),
+            _nvml_try(pynvml.nvmlDeviceGetFanSpeed, h),
+            uuid,
+        ))
+    return stats
+
+
+def nvml_compute_processes():
+    get_procs = getattr(pynvml, 'nvmlDeviceGetComputeRunningProcesses_v3',
+                        pynvml.nvmlDeviceGetComputeRunningProcesses)
+    procs = []
+    for h, _, uuid, _ in _nvml_devices:
+        for p in _nvml_try(get_procs, h) or []:
+            name = _nvml_str(_nvml_try(pynvml.nvmlSystemGetProcessName, p.pid))
+            procs.append({
+                'pid': p.pid,
+                'name': os.path.basename(name) if name else '-',
+                'mem': p.usedGpuMemory >> 20 if p.usedGpuMemory else 0,
+                'uuid': uuid,
+                'sm': 0,
+                'mem_util': None,
+            })
+    return procs
+
+
+def nvml_pmon():
+    # Per-process SM/MEM util sampled since the previous call on each device
+    pmon = []
+    for h, idx, _, _ in _nvml_devices:
+        samples = _nvml_try(pynvml.nvmlDeviceGetProcessUtilization, h, _nvml_last_ts.get(idx, 0)) or []
+        latest = {}
+        for e in samples:
+            if e.pid not in latest or e.timeStamp > latest[e.pid].timeStamp:
+                latest[e.pid] = e
+        for e in latest.values():
+            pmon.append({'gpu': idx, 'pid': e.pid, 'sm': e.smUtil, 'mem': e.memUtil, 'cmd': ''})
+        if samples:
+            _nvml_last_ts[idx] = max(e.timeStamp for e in samples)
+    return pmon
+
+
 def enrich_procs_with_pmon(procs, pmon, uuid_to_index):
+    # Idle GPUs are the common case: nothing to match, skip building the index
+    if not procs or not pmon:
+        return procs
     ix = {(e['gpu'], e['pid']): e for e in pmon if e['pid'] is not None}
     for p in procs:
         gpu_idx = uuid_to_index.get(p['uuid'])
@@ -124,161 +435,268 @@ def enrich_procs_with_pmon(procs, pmon, uuid_to_index):
     return procs
 
 
+# Row layouts shared by the curses view and --once output
+GPU_HDR = "Idx  Name                             Temp Util  Mem(Used/Total)    Power       SMClk Fan"
+GPU_FMT = "%-4d %-30.30s %3dC  %3d%%  %-16s  %-10s  %-6s %4s"
+PROC_HDR = "  PID      SM%  MEM%  VRAM       CMD"
+PROC_FMT = "  %-8d %3s  %4s  %-9s  %s"
+
+
+def format_gpu_line(g):
+    mem = "%d / %d MiB" % (g.mem_used, g.mem_total)
+    pwr = "%.0f/%.0f W" % (g.pwr, g.pwr_lim) if g.pwr is not None and g.pwr_lim is not None else "N/A"
+    smc = "%d MHz" % g.sm_clock if g.sm_clock is not None else "N/A"
+    fan = "%d%%" % g.fan if g.fan is not None else "N/A"
+    return GPU_FMT % (g.index, g.name, g.temp, g.util, mem, pwr, smc, fan)
+
+
+BYTE_UNITS = ('B', 'KB', 'MB', 'GB', 'TB', 'PB')
+
+
 def human_bytes(mib):
     try:
-        b = int(mib) * 1024 * 1024
-    except Exception:
+        b = mib << 20
+    except TypeError:
         return f"{mib} MiB"
-    for unit in ['B','KB','MB','GB','TB']:
-        if b < 1024:
-            return f"{b:.0f} {unit}"
-        b /= 1024
-    return f"{b:.1f} PB"
-
-
-def snapshot():
-    gpus = get_gpu_stats()
-    uuid_to_index = {g['uuid']: g['index'] for g in gpus}
-    procs = get_compute_processes()
-    pmon = get_pmon_once()
+    # Unit is picked from the bit length: every 10 bits is one step of 1024
+    s = min(max((b.bit_length() - 1) // 10, 0), len(BYTE_UNITS) - 1)
+    return "%.0f %s" % (b / (1 << (10 * s)), BYTE_UNITS[s])
+
+
+_uuid_to_index = {}
+_proc_sort_key = itemgetter('sm', 'mem')
+
+
+def get_uuid_to_index(gpus):
+    # UUID -> index never changes for a device; rebuild only if the GPU count does
+    global _uuid_to_index
+    if len(_uuid_to_index) != len(gpus):
+        _uuid_to_index = {g.uuid: g.index for g in gpus}
+    return _uuid_to_index
+
+
+def snapshot(streamer=None, limit=None):
+    if _nvml_devices:
+        gpus = nvml_gpu_stats()
+        procs = nvml_compute_processes()
+        pmon = nvml_pmon()
+    else:
+        # Prefer the long-lived streams; fall back to one-shot queries if a
+        # stream has not produced a sample (e.g. nvidia-smi exited).
+        block = streamer.read_gpu() if streamer else None
+        gpus = parse_gpu_stats(block) if block is not None else get_gpu_stats()
+        procs = get_compute_processes()
+        pmon = streamer.read_pmon() if streamer else None
+        if pmon is None:
+            pmon = get_pmon_once()
+    uuid_to_index = get_uuid_to_index(gpus)
     procs = enrich_procs_with_pmon(procs, pmon, uuid_to_index)
     # Index processes per GPU index
     per_gpu = {}
     for g in gpus:
-        per_gpu[g['index']] = []
+        per_gpu[g.index] = []
     for p in procs:
         idx = uuid_to_index.get(p['uuid'])
         if idx is not None and idx in per_gpu:
             per_gpu[idx].append(p)
-    # Sort each GPU's processes by SM util desc, then mem desc
-    for idx in per_gpu:
-        per_gpu[idx].sort(key=lambda x: (x['sm'] or 0, x['mem'] or 0), reverse=True)
+    # Sort each GPU's processes by SM util desc, then mem desc. With a limit
+    # only the top entries are selected, which stays O(n log limit) on busy GPUs.
+    for idx, plist in per_gpu.items():
+        if limit is not None and 0 < limit < len(plist):
+            per_gpu[idx] = heapq.nlargest(limit, plist, key=_proc_sort_key)
+        else:
+            plist.sort(key=_proc_sort_key, reverse=True)
     return gpus, per_gpu
 
 
-def draw(stdscr, interval: float, max_procs: int, sort_by_util: bool):
+def draw(stdscr, interval: float, max_procs: int, streamer=None):
     curses.curs_set(0)
-    stdscr.nodelay(True)
     h, w = stdscr.getmaxyx()
-
-    while True:
-        stdscr.erase()
-        now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        title = f"gpu-top | {now} | refresh={interval:.1f}s | q=quit"
-        stdscr.addstr(0, 0, title[:w - 1], curses.A_BOLD)
-
-        if not have_nvidia_smi():
-            stdscr.addstr(2, 0, "nvidia-smi not found. Please install NVIDIA drivers.", curses.A_BOLD)
-            stdscr.refresh()
-            time.sleep(interval)
-            ch = stdscr.getch()
-            if ch == ord('q'):
-                break
-            continue
-
-        gpus, per_gpu = snapshot()
-
+    # All drawing goes to an offscreen pad that is flipped once per tick.
+    # stdscr itself is refreshed once here so getch() never repaints it.
+    pad = curses.newpad(h, w)
+    stdscr.refresh()
+    # Shadow buffer: row -> (text, attr) currently on screen
+    last_lines = {}
+    drawn = set()
+
+    def put(row, text, attr=0):
+        # Only touch the terminal when a row's content actually changed
+        if row >= h - 1:
+            return
+        text = text[:w - 1]
+        drawn.add(row)
+        if last_lines.get(row) == (text, attr):
+            return
+        pad.move(row, 0)
+        pad.clrtoeol()
+        pad.addstr(row, 0, text, attr)
+        last_lines[row] = (text, attr)
+
+    def render(gpus, per_gpu):
+        # Rows from h - 1 down would be clipped, so stop building lines there
+        last = h - 1
         row = 2
+        if row >= last:
+            return
         # GPU summary header
-        stdscr.addstr(row, 0, f"GPU Summary:", curses.A_UNDERLINE)
-        row += 1
-        stdscr.addstr(row, 0, f"Idx  Name                             Temp Util  Mem(Used/Total)    Power       SMClk Fan")
+        put(row, f"GPU Summary:", curses.A_UNDERLINE)
         row += 1
-        for g in gpus:
-            mem = f"{g['mem_used']} / {g['mem_total']} MiB"
-            pwr = f"{g['pwr']:.0f}/{g['pwr_lim']:.0f} W" if g['pwr'] is not None and g['pwr_lim'] is not None else "N/A"
-            smc = f"{g['sm_clock']} MHz" if g['sm_clock'] is not None else "N/A"
-            fan = f"{g['fan']}%" if g['fan'] is not None else "N/A"
-            line = f"{g['index']:<4} {g['name'][:30]:<30} {g['temp']:>3}C  {g['util']:>3}%  {mem:<16}  {pwr:<10}  {smc:<6} {fan:>4}"
-            stdscr.addstr(row, 0, line[:w - 1])
+        for line in [GPU_HDR] + [format_gpu_line(g) for g in gpus[:max(0, last - row - 1)]]:
+            put(row, line)
             row += 1
 
         row += 1
-        stdscr.addstr(row, 0, f"Per-GPU Processes (top {max_procs} by SM util):", curses.A_UNDERLINE)
+        if row >= last:
+            return
+        put(row, f"Per-GPU Processes (top {max_procs} by SM util):", curses.A_UNDERLINE)
         row += 1
         for g in gpus:
-            stdscr.addstr(row, 0, f"GPU {g['index']} - {g['name']}")
+            if row >= last:
+                return
+            put(row, f"GPU {g.index} - {g.name}")
             row += 1
-            stdscr.addstr(row, 0, f"  PID      SM%  MEM%  VRAM       CMD")
+            if row >= last:
+                return
+            put(row, PROC_HDR)
             row += 1
-            procs = per_gpu.get(g['index'], [])
-            if sort_by_util:
-                procs = sorted(procs, key=lambda p: (p['sm'] or 0, p['mem_util'] or 0), reverse=True)
-            for p in procs[:max_procs]:
-                vram = human_bytes(p['mem'] * 1024 * 1024) if isinstance(p['mem'], int) else '-'
-                sm = '-' if p['sm'] is None else f"{p['sm']:>3}"
-                mu = '-' if p['mem_util'] is None else f"{p['mem_util']:>3}"
+            procs = per_gpu.get(g.index, [])
+            # Only as many processes as there are rows left
+            for p in procs[:min(max_procs, last - row)]:
+                vram = human_bytes(p['mem']) if isinstance(p['mem'], int) else '-'
+                sm = str(p['sm'])
+                mu = '-' if p['mem_util'] is None else str(p['mem_util'])
                 cmd = p['name']
-                stdscr.addstr(row, 0, f"  {p['pid']:<8} {sm:>3}  {mu:>4}  {vram:<9}  {cmd}"[:w - 1])
+                put(row, PROC_FMT % (p['pid'], sm, mu, vram, cmd))
                 row += 1
-            if not procs:
-                stdscr.addstr(row, 0, "  (no compute processes)")
+            if not procs and row < last:
+                put(row, "  (no compute processes)")
                 row += 1
             row += 1
 
-        stdscr.refresh()
-
-        # Non-blocking key handling
-        t0 = time.time()
+    def clear_stale():
+        # Blank rows that held content last tick but were not drawn this tick
+        for row in [r for r in last_lines if r not in drawn]:
+            pad.move(row, 0)
+            pad.clrtoeol()
+            del last_lines[row]
+        drawn.clear()
+
+    def flip():
+        clear_stale()
+        pad.noutrefresh(0, 0, 0, 0, h - 1, w - 1)
+        curses.doupdate()
+
+    def wait_key():
+        # Blocks until the refresh interval elapses, 'q' is pressed or the
+        # terminal is resized; other keys just resume waiting so they cannot
+        # force extra snapshots. Returns True when the user asked to quit.
+        nonlocal h, w, pad
+        deadline = time.monotonic() + interval
         while True:
+            # getch() runs at least once per tick so 'q' is read even with -i 0
+            stdscr.timeout(max(int((deadline - time.monotonic()) * 1000), 0))
             ch = stdscr.getch()
             if ch == ord('q'):
-                return
-            # small sleep steps to keep UI responsive
-            if time.time() - t0 >= interval:
+                return True
+            if ch == curses.KEY_RESIZE:
+                # Geometry changed: new pad, forget the shadow buffer and
+                # redraw everything. The cleared stdscr is staged now so the
+                # next flip() paints the pad over a blank screen.
+                h, w = stdscr.getmaxyx()
+                pad = curses.newpad(h, w)
+                last_lines.clear()
+                stdscr.clear()
+                stdscr.noutrefresh()
+                return False
+            if ch == -1 or time.monotonic() >= deadline:
+                return False
+
+    # The title only changes when the wall-clock second does
+    title_sec = None
+    title = ''
+
+    while True:
+        sec = int(time.time())
+        if sec != title_sec:
+            title_sec = sec
+            now = time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(sec))
+            title = f"gpu-top | {now} | refresh={interval:.1f}s | q=quit"
+        put(0, title, curses.A_BOLD)
+
+        if not _nvml_devices and not have_nvidia_smi():
+            put(2, "nvidia-smi not found. Please install NVIDIA drivers.", curses.A_BOLD)
+            flip()
+            if wait_key():
                 break
-            time.sleep(0.05)
+            continue
+
+        gpus, per_gpu = snapshot(streamer, max_procs)
+        render(gpus, per_gpu)
+        flip()
+
+        if wait_key():
+            return
 
 
 def print_once():
-    if not have_nvidia_smi():
+    if not _nvml_devices and not have_nvidia_smi():
         print("nvidia-smi not found.")
         return 1
     gpus, per_gpu = snapshot()
-    now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-    print(f"gpu-top snapshot {now}")
-    print("Idx  Name                             Temp Util  Mem(Used/Total)    Power       SMClk Fan")
-    for g in gpus:
-        mem = f"{g['mem_used']} / {g['mem_total']} MiB"
-        pwr = f"{g['pwr']:.0f}/{g['pwr_lim']:.0f} W" if g['pwr'] is not None and g['pwr_lim'] is not None else "N/A"
-        smc = f"{g['sm_clock']} MHz" if g['sm_clock'] is not None else "N/A"
-        fan = f"{g['fan']}%" if g['fan'] is not None else "N/A"
-        line = f"{g['index']:<4} {g['name'][:30]:<30} {g['temp']:>3}C  {g['util']:>3}%  {mem:<16}  {pwr:<10}  {smc:<6} {fan:>4}"
-        print(line)
-    print()
+    now = time.strftime('%Y-%m-%d %H:%M:%S')
+    # Collect the whole report and hand it to stdout in a single write
+    out = [f"gpu-top snapshot {now}", GPU_HDR]
+    out.extend(format_gpu_line(g) for g in gpus)
+    out.append('')
     for g in gpus:
-        print(f"GPU {g['index']} - {g['name']}")
-        print("  PID      SM%  MEM%  VRAM       CMD")
-        procs = per_gpu.get(g['index'], [])
+        out.append(f"GPU {g.index} - {g.name}")
+        out.append(PROC_HDR)
+        procs = per_gpu.get(g.index, [])
         for p in procs:
-            vram = human_bytes(p['mem'] * 1024 * 1024) if isinstance(p['mem'], int) else '-'
-            sm = '-' if p['sm'] is None else f"{p['sm']:>3}"
-            mu = '-' if p['mem_util'] is None else f"{p['mem_util']:>3}"
+            vram = human_bytes(p['mem']) if isinstance(p['mem'], int) else '-'
+            sm = str(p['sm'])
+            mu = '-' if p['mem_util'] is None else str(p['mem_util'])
             cmd = p['name']
-            print(f"  {p['pid']:<8} {sm:>3}  {mu:>4}  {vram:<9}  {cmd}")
+            out.append(PROC_FMT % (p['pid'], sm, mu, vram, cmd))
         if not procs:
-            print("  (no compute processes)")
-        print()
+            out.append("  (no compute processes)")
+        out.append('')
+    sys.stdout.write('\n'.join(out) + '\n')
+    sys.stdout.flush()
     return 0
 
 
 def main():
-    parser = argparse.ArgumentParser(description='Top-like GPU monitor using nvidia-smi (no dependencies).')
+    parser = argparse.ArgumentParser(description='Top-like GPU monitor using NVML (pynvml, if installed) or nvidia-smi.')
     parser.add_argument('-i', '--interval', type=float, default=1.0, help='Refresh interval in seconds (default: 1.0)')
     parser.add_argument('-n', '--max-procs', type=int, default=10, help='Max processes shown per GPU (default: 10)')
     parser.add_argument('--once', action='store_true', help='Print a single snapshot and exit (non-interactive)')
-    parser.add_argument('--sort-util', action='store_true', help='Sort processes by SM utilization descending')
+    parser.add_argument('--sort-util', action='store_true', help='Sort processes by SM utilization descending (always on; kept for compatibility)')
     args = parser.parse_args()
 
+    use_nvml = nvml_init()
+
     if args.once:
         code = print_once()
         raise SystemExit(code)
 
-    if not have_nvidia_smi():
+    if not use_nvml and not have_nvidia_smi():
         print('nvidia-smi not found. Please install NVIDIA drivers and nvidia-utils.')
         raise SystemExit(1)
 
-    curses.wrapper(lambda stdscr: draw(stdscr, args.interval, args.max_procs, args.sort_util))
+    streamer = None
+    if not use_nvml:
+        # Count raw lines, not parsed rows: a row that fails to parse is
+        # still one line per sample in the stream. stderr is dropped as the
+        # stream drops it, so driver warnings do not inflate the count.
+        gpu_count = len(parse_csv(run_cmd(_QUERY_GPU_ARGV, stderr=subprocess.DEVNULL)))
+        streamer = NvsmiStreamer(args.interval, gpu_count) if gpu_count else None
+    try:
+        curses.wrapper(lambda stdscr: draw(stdscr, args.interval, args.max_procs, streamer))
+    finally:
+        if streamer:
+            streamer.close()
 
 
 if __name__ == '__main__':